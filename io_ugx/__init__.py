@@ -10,33 +10,56 @@ bl_info = {
     "category": "Import-Export"
 }
 
+import time
+
+# start of the addon import, to measure the registration cost
+import_start = time.perf_counter()
+
 if "bpy" in locals():
     import importlib
-    modules = [ugx_io, visualizer, subsets]
-
-    for module in modules:
-        importlib.reload(module)
-else:
-    from . import ugx_io
-    from . import visualizer
-    from . import subsets
-
-from io_ugx.visualizer import ViewportDrawing
-from io_ugx.ugx_io import UGXExporter, UGXImporter
-from io_ugx.subsets import UGXSubsetsListActions, UGXSubsetsAdditions, UGXSUBSETS_UL_Items, UGXSubset, UGXSubsetsProperties, UGXSubsetsPanel, UGXSubsetsIntitialize
-
-import bpy
-from bpy.props import (IntProperty,
-                       BoolProperty,
-                       StringProperty,
-                       CollectionProperty,
-                       PointerProperty,
-                       FloatVectorProperty)
-
-from bpy.types import (Operator,
-                       Panel,
-                       PropertyGroup,
-                       UIList)
+    import sys
+
+    # heavy modules are loaded on first use, only reload the ones already loaded
+    for name in ("lazy", "ugx_grid", "sequence", "ugx_io", "visualizer", "subsets"):
+        module = sys.modules.get(f"{__name__}.{name}")
+        if module is not None:
+            importlib.reload(module)
+
+try:
+    import bpy
+except ModuleNotFoundError:
+    # parser processes of a parallel import load the package without Blender, they only use ugx_grid
+    bpy = None
+
+if bpy is not None:
+    from io_ugx.sequence import update_sequences, check_sequences, free_sequences
+    from io_ugx.ugx_io import UGXExporter, UGXImporter, UGXLoadFullResolution
+    from io_ugx.subsets import update_statistics, UGXSubsetsListActions, UGXSubsetsAdditions, UGXSUBSETS_UL_Items, UGXSubset, UGXSubsetsProperties, UGXSubsetsPanel, UGXSubsetsIntitialize
+
+    from bpy.props import (IntProperty,
+                           BoolProperty,
+                           StringProperty,
+                           CollectionProperty,
+                           PointerProperty,
+                           FloatVectorProperty)
+
+    from bpy.types import (Operator,
+                           Panel,
+                           PropertyGroup,
+                           UIList)
+
+    classes = (
+        UGXSubsetsListActions,
+        UGXSubsetsAdditions,
+        UGXSUBSETS_UL_Items,
+        UGXSubset,
+        UGXSubsetsProperties,
+        UGXSubsetsPanel,
+        UGXSubsetsIntitialize,
+        UGXExporter,
+        UGXImporter,
+        UGXLoadFullResolution
+    )
 
 def menu_func_export(self, context):
     self.layout.operator(UGXExporter.bl_idname, text="UG4 Grid (.ugx)")
@@ -44,21 +67,8 @@ def menu_func_export(self, context):
 def menu_func_import(self, context):
     self.layout.operator(UGXImporter.bl_idname, text="UG4 Grid (.ugx)")
 
-classes = (
-    UGXSubsetsListActions,
-    UGXSubsetsAdditions,
-    UGXSUBSETS_UL_Items,
-    UGXSubset,
-    UGXSubsetsProperties,
-    UGXSubsetsPanel,
-    UGXSubsetsIntitialize,
-    UGXExporter,
-    UGXImporter
-)
-
 def register():
-    dns = bpy.app.driver_namespace
-    dns["viewport_drawing"] = ViewportDrawing()
+    start = time.perf_counter()
 
     for cls in classes:
         bpy.utils.register_class(cls)
@@ -70,6 +80,14 @@ def register():
     bpy.types.TOPBAR_MT_file_export.append(menu_func_export)
     bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
 
+    bpy.app.handlers.frame_change_post.append(update_sequences)
+    bpy.app.timers.register(check_sequences, persistent=True)
+    bpy.app.handlers.depsgraph_update_post.append(update_statistics)
+
+    if bpy.app.debug:
+        end = time.perf_counter()
+        print(f"io_ugx: import {(start - import_start) * 1000:.1f} ms, register {(end - start) * 1000:.1f} ms")
+
 
 
 def unregister():
@@ -79,14 +97,21 @@ def unregister():
     bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
 
+    bpy.app.handlers.frame_change_post.remove(update_sequences)
+    if bpy.app.timers.is_registered(check_sequences):
+        bpy.app.timers.unregister(check_sequences)
+    free_sequences()
+    bpy.app.handlers.depsgraph_update_post.remove(update_statistics)
+
     del bpy.types.Scene.ugx_subsets
     del bpy.types.Scene.ugx_properties
     del bpy.types.Scene.active_subset
 
-    dns = bpy.app.driver_namespace
+    drawing = bpy.app.driver_namespace.pop("viewport_drawing", None)
 
-    for dh in dns["viewport_drawing"].draw_handler:
-        bpy.types.SpaceView3D.draw_handler_remove(dh, 'WINDOW')
+    if drawing is not None:
+        for dh in drawing.draw_handler:
+            bpy.types.SpaceView3D.draw_handler_remove(dh, 'WINDOW')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+import importlib
+
+
+class LazyModule:
+    """Module that is only imported on first attribute access.
+
+    Used for heavy dependencies, so enabling the addon does not load them
+    until an import, export or visualization is actually used.
+    """
+
+    def __init__(self, name: str, package: str = None) -> None:
+        self._name = name
+        self._package = package
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name, self._package)
+
+        return getattr(self._module, attr)
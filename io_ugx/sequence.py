@@ -0,0 +1,215 @@
+import os
+import re
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+from bpy.app.handlers import persistent
+
+from .lazy import LazyModule
+
+etree = LazyModule("lxml.etree")
+ugx_grid = LazyModule(".ugx_grid", __package__)
+
+
+def sequence_files(filepath: str) -> list:
+    """Finds all files of the time series the given file belongs to.
+
+    Files of a series only differ in the number at the end of their name,
+    e.g. solution_0001.ugx, solution_0002.ugx, ...
+
+    Args:
+        filepath (str): Path of one file of the series.
+
+    Returns:
+        list: Paths of all files of the series, ordered by their number.
+    """
+    directory, filename = os.path.split(filepath)
+    match = re.fullmatch(r"(.*?)(\d+)(\.ugx)", filename)
+
+    if match is None:
+        return [filepath]
+
+    prefix, _, suffix = match.groups()
+    pattern = re.compile(re.escape(prefix) + r"(\d+)" + re.escape(suffix))
+
+    steps = []
+    for f in os.listdir(directory or "."):
+        m = pattern.fullmatch(f)
+        if m is not None:
+            steps.append((int(m.group(1)), os.path.join(directory, f)))
+
+    return [f for _, f in sorted(steps)]
+
+
+class UGXSequence:
+    """Vertex coordinates of a time series of ugx files with fixed topology.
+
+    Coordinates are loaded by a background thread and kept in a bounded
+    cache. Accessing a frame prefetches the following ones.
+    """
+
+    def __init__(self, files: list, cache_size: int = 16, prefetch: int = 4) -> None:
+        self.files = files
+        self.cache_size = cache_size
+        self.prefetch = prefetch
+
+        # frame index -> (modification time, future of the coordinates)
+        self.cache = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # frame index and modification time of the coordinates in the mesh
+        # and of the last frame which could not be loaded, reported only once
+        self.current = None
+        self.failed = None
+
+    def mtime(self, index: int) -> float:
+        try:
+            return os.stat(self.files[index]).st_mtime
+        except OSError:
+            return 0.0
+
+    def request(self, index: int) -> tuple:
+        """Returns the cache entry of a frame, loading it if missing or outdated.
+
+        Args:
+            index (int): Index of the frame.
+
+        Returns:
+            tuple: Modification time and future of the coordinates.
+        """
+        mtime = self.mtime(index)
+        entry = self.cache.get(index)
+
+        if entry is None or entry[0] != mtime:
+            entry = (mtime, self.executor.submit(ugx_grid.read_vertices, self.files[index]))
+            self.cache[index] = entry
+
+        self.cache.move_to_end(index)
+
+        return entry
+
+    def get(self, index: int) -> tuple:
+        """Gets the coordinates of a frame and prefetches the next frames.
+
+        Args:
+            index (int): Index of the frame.
+
+        Returns:
+            tuple: Modification time and coordinates of the frame.
+        """
+        mtime, future = self.request(index)
+
+        for i in range(index + 1, min(index + 1 + self.prefetch, len(self.files))):
+            self.request(i)
+
+        # keep the requested frame, even if it is the oldest entry
+        self.cache.move_to_end(index)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        return mtime, future.result()
+
+    def update(self, mesh: bpy.types.Mesh, frame: int) -> None:
+        """Writes the coordinates of the given frame into the mesh.
+
+        Args:
+            mesh (bpy.types.Mesh): The mesh of the sequence.
+            frame (int): Index of the frame, clamped to the sequence.
+        """
+        index = min(max(frame, 0), len(self.files) - 1)
+        key = (index, self.mtime(index))
+
+        if key == self.current or key == self.failed:
+            return
+
+        try:
+            mtime, coords = self.get(index)
+        except (etree.XMLSyntaxError, OSError) as e:
+            # the file may still be written by the simulation, it is read again once it changes
+            self.cache.pop(index, None)
+            self.failed = key
+            print(f"{self.files[index]}: {e}")
+            return
+
+        if len(coords) != len(mesh.vertices):
+            self.failed = key
+            print(f"{self.files[index]}: expected {len(mesh.vertices)} vertices, found {len(coords)}.")
+            return
+
+        mesh.vertices.foreach_set("co", coords.ravel())
+        mesh.update()
+
+        self.current = (index, mtime)
+
+    def free(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.clear()
+
+
+def get_sequence(obj: bpy.types.Object) -> UGXSequence:
+    """Gets the sequence of an object, creating it after a blend file was loaded.
+
+    Args:
+        obj (bpy.types.Object): Object imported as ugx sequence.
+
+    Returns:
+        UGXSequence: The sequence of the object, None if its directory can not be read.
+    """
+    sequences = bpy.app.driver_namespace.setdefault("ugx_sequences", {})
+
+    if obj.name not in sequences:
+        try:
+            files = sequence_files(obj["ugx_sequence"])
+        except OSError:
+            return None
+
+        sequences[obj.name] = UGXSequence(files)
+
+    return sequences[obj.name]
+
+
+@persistent
+def update_sequences(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph = None) -> None:
+    """Updates the vertex coordinates of all ugx sequences to the current frame.
+
+    Args:
+        scene (bpy.types.Scene): The scene.
+        depsgraph (bpy.types.Depsgraph): The dependency graph, unused.
+    """
+    sequences = bpy.app.driver_namespace.setdefault("ugx_sequences", {})
+
+    # free the sequences of deleted or renamed objects
+    for name in list(sequences):
+        obj = bpy.data.objects.get(name)
+        if obj is None or "ugx_sequence" not in obj:
+            sequences.pop(name).free()
+
+    for obj in scene.objects:
+        if obj.type == 'MESH' and "ugx_sequence" in obj:
+            sequence = get_sequence(obj)
+            if sequence is not None:
+                sequence.update(obj.data, scene.frame_current - obj.get("ugx_sequence_start", 0))
+
+
+def check_sequences() -> float:
+    """Timer reloading sequences whose current file changed on disk.
+
+    Returns:
+        float: Seconds until the next check.
+    """
+    if bpy.context.scene is not None:
+        update_sequences(bpy.context.scene)
+
+    return 1.0
+
+
+def free_sequences() -> None:
+    sequences = bpy.app.driver_namespace.get("ugx_sequences", {})
+
+    for sequence in sequences.values():
+        sequence.free()
+
+    sequences.clear()
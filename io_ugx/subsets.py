@@ -14,13 +14,99 @@ from bpy.types import (Operator,
                        PropertyGroup,
                        UIList)
 
-dns = bpy.app.driver_namespace
+from bpy.app.handlers import persistent
 
-try:
-    drawing = dns["viewport_drawing"]
-except KeyError:
-    from .visualizer import ViewportDrawing
-    drawing = dns["viewport_drawing"] = ViewportDrawing()
+from .lazy import LazyModule
+
+np = LazyModule("numpy")
+
+# subset statistics by mesh name, computed on first draw after the mesh changed
+statistics = {}
+
+def get_drawing():
+    """Gets the viewport drawing of the subsets, creating it on first use."""
+    dns = bpy.app.driver_namespace
+
+    if "viewport_drawing" not in dns:
+        from .visualizer import ViewportDrawing
+        dns["viewport_drawing"] = ViewportDrawing()
+
+    return dns["viewport_drawing"]
+
+def get_statistics(mesh: bpy.types.Mesh, scene: bpy.types.Scene) -> dict:
+    """Gets the statistics of each subset of the mesh, computing them if not cached.
+
+    Args:
+        mesh (bpy.types.Mesh): The mesh with subset attributes.
+        scene (bpy.types.Scene): The scene with the subsets.
+
+    Returns:
+        dict: Element counts, edge lengths and face areas, indexed by subset.
+    """
+    num_subsets = max((s.index for s in scene.ugx_subsets), default=-1) + 1
+
+    stats = statistics.get(mesh.name_full)
+    if stats is not None and len(stats["vertices"]) >= num_subsets:
+        return stats
+
+    def layer(name: str, count: int):
+        values = np.zeros(count, dtype=np.int32)
+        attribute = mesh.attributes.get(name)
+        if attribute is not None:
+            attribute.data.foreach_get("value", values)
+        return np.clip(values, 0, None)
+
+    vertex_subset = layer("vertex_subset", len(mesh.vertices))
+    edge_subset = layer("edge_subset", len(mesh.edges))
+    face_subset = layer("face_subset", len(mesh.polygons))
+
+    coords = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords.ravel())
+
+    edges = np.empty((len(mesh.edges), 2), dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges.ravel())
+    lengths = np.linalg.norm(coords[edges[:, 1]] - coords[edges[:, 0]], axis=1)
+
+    areas = np.empty(len(mesh.polygons), dtype=np.float32)
+    mesh.polygons.foreach_get("area", areas)
+
+    stats = {
+        "vertices": np.bincount(vertex_subset, minlength=num_subsets),
+        "edges": np.bincount(edge_subset, minlength=num_subsets),
+        "faces": np.bincount(face_subset, minlength=num_subsets),
+        "length": np.bincount(edge_subset, weights=lengths, minlength=num_subsets),
+        "area": np.bincount(face_subset, weights=areas, minlength=num_subsets),
+    }
+    statistics[mesh.name_full] = stats
+
+    return stats
+
+def invalidate_statistics(mesh: bpy.types.Mesh = None) -> None:
+    """Removes the cached statistics of a mesh, or of all meshes if None."""
+    if mesh is None:
+        statistics.clear()
+    else:
+        statistics.pop(mesh.name_full, None)
+
+@persistent
+def update_statistics(scene: bpy.types.Scene, depsgraph: bpy.types.Depsgraph) -> None:
+    """Invalidates the statistics of meshes whose geometry changed.
+
+    Meshes in edit mode keep their statistics, their attributes are only
+    written back when leaving edit mode or assigning subsets, which
+    invalidates them explicitly.
+    """
+    if len(statistics) == 0:
+        return
+
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+
+        if isinstance(update.id, bpy.types.Mesh) and not update.id.original.is_editmode:
+            invalidate_statistics(update.id.original)
+        elif isinstance(update.id, bpy.types.Object) and update.id.type == 'MESH' and update.id.original.mode != 'EDIT':
+            invalidate_statistics(update.id.original.data)
 
 class UGXSubsetsListActions(Operator):
     """Move items up and down, add and remove"""
@@ -146,11 +232,15 @@ class UGXSubsetsAdditions(bpy.types.Operator):
                         bm.faces[f.index][subsets] = scene.active_subset
 
                 # update visualisation
-                drawing.draw_faces(obj)
+                get_drawing().draw_faces(obj)
 
 
         bmesh.update_edit_mesh(obj.data)
 
+        # write the subsets to the mesh, so the statistics can be read in bulk
+        obj.update_from_editmode()
+        invalidate_statistics(obj.data)
+
         return {"FINISHED"}
 
 class UGXSUBSETS_UL_Items(bpy.types.UIList):
@@ -158,7 +248,16 @@ class UGXSUBSETS_UL_Items(bpy.types.UIList):
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             split = layout.split(factor=0.1)
             split.label(text=f'{index}')
-            split.prop(item, "name", text="", emboss=False, icon_value=icon)
+
+            obj = context.active_object
+            if data.ugx_properties.show_statistics and obj is not None and obj.type == 'MESH':
+                split = split.split(factor=0.5)
+                split.prop(item, "name", text="", emboss=False, icon_value=icon)
+
+                stats = get_statistics(obj.data, data)
+                split.label(text=f'{stats["vertices"][item.index]} / {stats["edges"][item.index]} / {stats["faces"][item.index]}')
+            else:
+                split.prop(item, "name", text="", emboss=False, icon_value=icon)
 
         elif self.layout_type in {'GRID'}:
             layout.alignment = 'CENTER'
@@ -178,6 +277,9 @@ class UGXSubsetsProperties(PropertyGroup):
                              default=False)
     current_subset: IntProperty(name="Current Subset",
                                 description="Index of Currently Selected Subset")
+    show_statistics: BoolProperty(name="Show Statistics",
+                                  description="Show Number of Vertices/Edges/Faces, Edge Length and Face Area of Subsets",
+                                  default=False)
 
 class UGXSubsetsIntitialize(Operator):
     """Initialize the Subset Property"""
@@ -206,6 +308,7 @@ class UGXSubsetsIntitialize(Operator):
         faces = bm.faces.layers.int.new("face_subset")
 
         bmesh.update_edit_mesh(obj.data)
+        invalidate_statistics(obj.data)
 
         # add default subset
         if len(scene.ugx_subsets) == 0:
@@ -239,13 +342,19 @@ class UGXSubsetsPanel(bpy.types.Panel):
         scene = bpy.context.scene
         obj = context.active_object
 
+        if "ugx_preview" in obj:
+            row = layout.row()
+            row.operator("import.ugx_full_resolution", text="Load Full Resolution")
+
         row = layout.row()
         row.operator("ugx.subset_initialize", text="Initialize Subsets")
 
         row = layout.row()
         row.prop(scene.ugx_properties, "view_check", text="Show Subsets")
+        row.prop(scene.ugx_properties, "show_statistics", text="Show Statistics")
 
         # visualisation of subsets
+        drawing = get_drawing()
         if scene.ugx_properties.view_check:
             if len(drawing.draw_handler) == 0:
                 if obj.data.attributes.get("vertex_subset"):
@@ -275,6 +384,15 @@ class UGXSubsetsPanel(bpy.types.Panel):
         col.operator(UGXSubsetsListActions.bl_idname, icon='TRIA_UP', text="").action = 'UP'
         col.operator(UGXSubsetsListActions.bl_idname, icon='TRIA_DOWN', text="").action = 'DOWN'
 
+        # statistics of the active subset
+        if scene.ugx_properties.show_statistics and obj.type == 'MESH' and 0 <= scene.active_subset < len(scene.ugx_subsets):
+            stats = get_statistics(obj.data, scene)
+            index = scene.ugx_subsets[scene.active_subset].index
+
+            col = layout.column(align=True)
+            col.label(text=f'Vertices: {stats["vertices"][index]}, Edges: {stats["edges"][index]}, Faces: {stats["faces"][index]}')
+            col.label(text=f'Edge Length: {stats["length"][index]:.6g}, Face Area: {stats["area"][index]:.6g}')
+
         # add selected items to subset
         row = layout.row()
         row.operator(UGXSubsetsAdditions.bl_idname, text="Add Selected Vertices").action = 'VERTICES'
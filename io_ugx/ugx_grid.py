@@ -0,0 +1,708 @@
+import re
+
+import numpy as np
+
+from lxml import etree
+
+
+def parse_array(text: str, dtype: type, width: int = 1) -> np.ndarray:
+    """Parses a whitespace separated list of numbers of a ugx section.
+
+    Args:
+        text (str): The text of the section, may be None.
+        dtype (type): The numpy data type of the values.
+        width (int): Number of values per element.
+
+    Returns:
+        np.ndarray: Array of shape (n, width), or (n, ) if width is 1.
+    """
+    if text is None or text.strip() == "":
+        data = np.zeros(0, dtype=dtype)
+    else:
+        data = np.fromstring(text, dtype=dtype, sep=" ")
+
+    if width == 1:
+        return data
+
+    return data.reshape(-1, width)
+
+
+def format_array(values: np.ndarray, chunk_size: int = 1 << 16) -> str:
+    """Formats numbers as whitespace separated list of a ugx section.
+
+    Floats are written with the shortest representation of their precision,
+    integral floats without decimals, like UG4 does. The numbers are
+    formatted in chunks, so the temporary strings stay small.
+
+    Args:
+        values (np.ndarray): The numbers, any shape.
+        chunk_size (int): Number of values formatted at once.
+
+    Returns:
+        str: The formatted list.
+    """
+    values = np.asarray(values).ravel()
+    chunks = []
+
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+
+        if values.dtype.kind == 'f':
+            chunks.append(re.sub(r"\.0\b", "", " ".join(chunk.astype(str).tolist())))
+        else:
+            chunks.append(" ".join(map(str, chunk.tolist())))
+
+    return " ".join(chunks)
+
+
+def parse_vertices(vertices: etree.Element) -> np.ndarray:
+    """Parses the vertex coordinates, 1D and 2D coordinates are padded with zeros.
+
+    Args:
+        vertices (lxml.etree.Element): The vertices element.
+
+    Returns:
+        np.ndarray: Array of shape (n, 3).
+    """
+    dim = int(vertices.get("coords", 3))
+    coords = parse_array(vertices.text, np.float32, dim)
+
+    if dim < 3:
+        coords = np.hstack((coords, np.zeros((len(coords), 3 - dim), dtype=np.float32)))
+
+    return coords
+
+
+def check_indices(indices: np.ndarray, count: int, section: str) -> np.ndarray:
+    """Checks that the indices of a section refer to existing elements.
+
+    Args:
+        indices (np.ndarray): The parsed indices, any shape.
+        count (int): Number of referenced elements.
+        section (str): Name of the section, used in the error message.
+
+    Raises:
+        ValueError: If an index is out of range.
+
+    Returns:
+        np.ndarray: The indices.
+    """
+    if indices.size > 0 and (indices.min() < 0 or indices.max() >= count):
+        index = indices.min() if indices.min() < 0 else indices.max()
+        raise ValueError(f"{section} refer to element {index}, which is not one of the {count} elements.")
+
+    return indices
+
+
+def parse_subset(subset: etree.Element) -> dict:
+    """Parses the definition of a subset, without its elements.
+
+    Args:
+        subset (lxml.etree.Element): The subset element.
+
+    Returns:
+        dict: Name, color and state of the subset.
+    """
+    return {
+        "name": subset.get("name"),
+        "color": [float(c) for c in subset.get("color", "0 0 0 1").split()],
+        "state": subset.get("state", "0"),
+    }
+
+
+def read_vertices(filepath: str) -> np.ndarray:
+    """Reads only the vertex coordinates of a ugx file.
+
+    The grid vertices are the first section of a ugx file, so parsing stops
+    right after them and the remaining file is never read.
+
+    Args:
+        filepath (str): Path of the ugx file.
+
+    Returns:
+        np.ndarray: Array of shape (n, 3).
+    """
+    for _, vertices in etree.iterparse(filepath, tag="vertices", huge_tree=True):
+        return parse_vertices(vertices)
+
+    return np.zeros((0, 3), dtype=np.float32)
+
+
+# per-element subset and selection arrays by element type
+SUBSET_KEYS = {"vertices": "vertex_subset", "edges": "edge_subset", "faces": "face_subset"}
+SELECT_KEYS = {"vertices": "vertex_select", "edges": "edge_select", "faces": "face_select"}
+
+# element sections, their element type and number of vertices per element
+ELEMENT_SECTIONS = {"edges": ("edges", 2), "triangles": ("faces", 3), "quads": ("faces", 4)}
+
+# ugx attachment sections by element type and the parsed attachment types
+ATTACHMENT_TAGS = {"vertices": "vertex_attachment", "edges": "edge_attachment", "faces": "face_attachment"}
+ATTACHMENT_DTYPES = {"double": np.float32, "float": np.float32, "int": np.int32}
+
+
+def iter_sections(filepath: str):
+    """Streams the sections of a ugx file, the direct children of the grid element.
+
+    Every section is cleared after it was handled, so the parsed tree never
+    holds more than the current section. Text nodes above the default limit
+    of libxml2 are allowed, large grids store millions of numbers in one.
+
+    Args:
+        filepath (str): Path of the ugx file.
+
+    Yields:
+        lxml.etree.Element: The sections in file order.
+    """
+    for _, element in etree.iterparse(filepath, events=("end",), huge_tree=True):
+        parent = element.getparent()
+
+        # skip the grid itself and the children of subsets and selectors
+        if parent is None or parent.getparent() is not None:
+            continue
+
+        yield element
+
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+class UGXGrid:
+    """Array representation of a ugx grid.
+
+    All elements are stored in numpy arrays, so they can be filtered and
+    handed to Blender in bulk. Faces are indexed the way UG4 indexes them,
+    first all triangles, then all quads.
+    """
+
+    def __init__(self) -> None:
+        self.vertices = np.zeros((0, 3), dtype=np.float32)
+        self.edges = np.zeros((0, 2), dtype=np.int32)
+        self.triangles = np.zeros((0, 3), dtype=np.int32)
+        self.quads = np.zeros((0, 4), dtype=np.int32)
+
+        # subset definitions (name, color, state) of the first subset handler
+        # and the subset index of every element, -1 if unassigned
+        self.subset_handler = "defSH"
+        self.subsets = []
+        self.vertex_subset = np.zeros(0, dtype=np.int32)
+        self.edge_subset = np.zeros(0, dtype=np.int32)
+        self.face_subset = np.zeros(0, dtype=np.int32)
+
+        # further subset handlers, dicts with name, subsets and the same per-element arrays
+        self.handlers = []
+
+        # projection handlers, kept as xml
+        self.projection_handlers = []
+
+        # vertex, edge and face attachments, dicts with name, type and one value per element
+        self.attachments = []
+
+        # selection state of every element
+        self.vertex_select = np.zeros(0, dtype=bool)
+        self.edge_select = np.zeros(0, dtype=bool)
+        self.face_select = np.zeros(0, dtype=bool)
+
+        # while reading, the number of elements of each type in the file and
+        # the file indices of the kept elements, None as long as all are kept
+        self.counts = {"vertices": 0, "edges": 0, "faces": 0}
+        self.indices = {"vertices": None, "edges": None, "faces": None}
+
+    @property
+    def num_faces(self) -> int:
+        return len(self.triangles) + len(self.quads)
+
+    @classmethod
+    def read(cls, filepath: str, subsets: set = None, bbox: tuple = None) -> "UGXGrid":
+        """Reads a ugx file.
+
+        Elements can be filtered by subset name and by an axis aligned bounding
+        box. The file is streamed section by section. Elements outside the box
+        are dropped directly after their section is parsed, elements of other
+        subsets as soon as the subset handler is read. The remaining vertices
+        are renumbered at the end.
+
+        Args:
+            filepath (str): Path of the ugx file.
+            subsets (set): Names of the subsets to keep, None to keep all.
+            bbox (tuple): (min, max) corners of the box to keep, None to keep all.
+
+        Returns:
+            UGXGrid: The parsed grid.
+        """
+        grid = cls()
+        box_mask = None
+        subset_mask = None
+
+        for section in iter_sections(filepath):
+            if section.tag == "vertices":
+                grid.read_vertices(section)
+                box_mask = grid.box_filter(bbox)
+            elif section.tag in ELEMENT_SECTIONS:
+                grid.read_elements(section, box_mask if bbox is not None else None)
+            elif section.tag in ATTACHMENT_TAGS.values():
+                grid.read_attachment(section)
+            elif section.tag == "subset_handler":
+                handler = grid.read_subset_handler(section)
+
+                if subset_mask is not None:
+                    grid.handlers.append(handler)
+                    continue
+
+                # the first handler defines the subsets of the grid
+                grid.subset_handler = handler["name"]
+                grid.subsets = handler["subsets"]
+                for key in SUBSET_KEYS.values():
+                    setattr(grid, key, handler[key])
+
+                subset_mask = grid.subset_filter(subsets)
+                if subsets is not None:
+                    grid.filter_subsets(subset_mask)
+            elif section.tag == "selector":
+                grid.read_selector(section)
+            elif section.tag == "projection_handler":
+                grid.projection_handlers.append(etree.tostring(section, encoding="unicode", with_tail=False).strip())
+
+        if subsets is None and bbox is None:
+            return grid
+
+        # a grid without subset handler has no elements in the kept subsets
+        if subset_mask is None:
+            subset_mask = grid.subset_filter(subsets)
+            grid.filter_subsets(subset_mask)
+
+        grid.compact(subset_mask[grid.vertex_subset] & box_mask)
+
+        return grid
+
+    def read_vertices(self, vertices: etree.Element) -> None:
+        """Reads the vertex coordinates.
+
+        Args:
+            vertices (lxml.etree.Element): The vertices section.
+        """
+        self.vertices = parse_vertices(vertices)
+        self.counts["vertices"] = len(self.vertices)
+
+        self.vertex_subset = np.full(len(self.vertices), -1, dtype=np.int32)
+        self.vertex_select = np.zeros(len(self.vertices), dtype=bool)
+
+    def read_elements(self, section: etree.Element, box_mask: np.ndarray = None) -> None:
+        """Reads the edges, triangles or quads of a section.
+
+        Args:
+            section (lxml.etree.Element): The edges, triangles or quads section.
+            box_mask (np.ndarray): Vertices inside the bounding box, None to keep all.
+        """
+        key, width = ELEMENT_SECTIONS[section.tag]
+        elements = check_indices(parse_array(section.text, np.int32, width), self.counts["vertices"], section.tag)
+
+        # quads are numbered after the triangles
+        offset = self.counts[key]
+        self.counts[key] += len(elements)
+
+        if box_mask is not None:
+            keep = np.all(box_mask[elements], axis=1)
+            elements = elements[keep]
+
+            indices = (np.flatnonzero(keep) + offset).astype(np.int32)
+            if self.indices[key] is not None:
+                indices = np.concatenate((self.indices[key], indices))
+            self.indices[key] = indices
+
+        setattr(self, section.tag, elements)
+        setattr(self, SUBSET_KEYS[key], np.concatenate((getattr(self, SUBSET_KEYS[key]), np.full(len(elements), -1, dtype=np.int32))))
+        setattr(self, SELECT_KEYS[key], np.concatenate((getattr(self, SELECT_KEYS[key]), np.zeros(len(elements), dtype=bool))))
+
+    def read_attachment(self, attachment: etree.Element) -> None:
+        """Reads a vertex, edge or face attachment with a float or int type.
+
+        Args:
+            attachment (lxml.etree.Element): The attachment section.
+        """
+        if attachment.get("type") not in ATTACHMENT_DTYPES:
+            return
+
+        key = next(k for k, tag in ATTACHMENT_TAGS.items() if tag == attachment.tag)
+        values = parse_array(attachment.text, ATTACHMENT_DTYPES[attachment.get("type")])
+
+        if self.indices[key] is not None:
+            values = values[self.indices[key]]
+
+        self.attachments.append({
+            "name": attachment.get("name"),
+            "type": attachment.get("type"),
+            "elements": key,
+            "values": values,
+        })
+
+    def read_subset_handler(self, handler: etree.Element) -> dict:
+        """Reads the subset definitions of a handler and the subset index of every kept element.
+
+        Args:
+            handler (lxml.etree.Element): The subset handler section.
+
+        Returns:
+            dict: Name, subset definitions (name, color, state) and per-element subset arrays.
+        """
+        result = {"name": handler.get("name", "defSH"), "subsets": []}
+        for array in SUBSET_KEYS.values():
+            result[array] = np.full(len(getattr(self, array)), -1, dtype=np.int32)
+
+        for i, s in enumerate(handler.findall("subset")):
+            result["subsets"].append(parse_subset(s))
+
+            for key, array in SUBSET_KEYS.items():
+                indices = check_indices(parse_array(s.findtext(key), np.int32), self.counts[key], f"{key} of subset {s.get('name')}")
+                result[array][self.local_indices(key, indices)] = i
+
+        return result
+
+    def read_selector(self, selector: etree.Element) -> None:
+        """Reads the selection state of the kept elements.
+
+        Args:
+            selector (lxml.etree.Element): The selector section.
+        """
+        for key, array in SELECT_KEYS.items():
+            indices = check_indices(parse_array(selector.findtext(key), np.int32), self.counts[key], f"selected {key}")
+            getattr(self, array)[self.local_indices(key, indices)] = True
+
+    def local_indices(self, key: str, indices: np.ndarray) -> np.ndarray:
+        """Maps file indices of elements to the indices of the kept elements.
+
+        Args:
+            key (str): Element type.
+            indices (np.ndarray): Element indices in the file.
+
+        Returns:
+            np.ndarray: Indices of the kept elements among them, dropped elements are left out.
+        """
+        kept = self.indices[key]
+        if kept is None:
+            return indices
+        if len(kept) == 0:
+            return indices[:0]
+
+        positions = np.minimum(np.searchsorted(kept, indices), len(kept) - 1)
+        return positions[kept[positions] == indices]
+
+    def filter_elements(self, key: str, mask: np.ndarray) -> None:
+        """Drops the per-element data of filtered elements.
+
+        The subsets, selection, attachment values and handler subsets are
+        filtered, the element arrays themselves are left to the caller.
+
+        Args:
+            key (str): Element type.
+            mask (np.ndarray): Kept elements.
+        """
+        for array in (SUBSET_KEYS[key], SELECT_KEYS[key]):
+            setattr(self, array, getattr(self, array)[mask])
+
+        for a in self.attachments:
+            if a["elements"] == key:
+                a["values"] = a["values"][mask]
+
+        for h in self.handlers:
+            h[SUBSET_KEYS[key]] = h[SUBSET_KEYS[key]][mask]
+
+        kept = self.indices[key]
+        self.indices[key] = np.flatnonzero(mask).astype(np.int32) if kept is None else kept[mask]
+
+    def subset_filter(self, subsets: set) -> np.ndarray:
+        """Returns a lookup table telling which subset indices are kept.
+
+        The table has one additional trailing entry, so unassigned elements
+        (index -1) can be looked up as well.
+
+        Args:
+            subsets (set): Names of the subsets to keep, None to keep all.
+
+        Returns:
+            np.ndarray: Boolean lookup table.
+        """
+        if subsets is None:
+            return np.ones(len(self.subsets) + 1, dtype=bool)
+
+        keep = [s["name"] in subsets for s in self.subsets]
+        return np.array(keep + [False], dtype=bool)
+
+    def box_filter(self, bbox: tuple) -> np.ndarray:
+        """Returns the mask of vertices inside the bounding box.
+
+        Args:
+            bbox (tuple): (min, max) corners of the box, None to keep all.
+
+        Returns:
+            np.ndarray: Boolean mask.
+        """
+        if bbox is None:
+            return np.ones(len(self.vertices), dtype=bool)
+
+        lower = np.asarray(bbox[0], dtype=np.float32)
+        upper = np.asarray(bbox[1], dtype=np.float32)
+
+        return np.all((self.vertices >= lower) & (self.vertices <= upper), axis=1)
+
+    def filter_subsets(self, subset_mask: np.ndarray) -> None:
+        """Drops the edges and faces of subsets which are not kept.
+
+        The boundary edges of kept faces are always kept, so the faces stay valid.
+
+        Args:
+            subset_mask (np.ndarray): Lookup table of kept subsets.
+        """
+        num_triangles = len(self.triangles)
+
+        face_keep = subset_mask[self.face_subset]
+        self.triangles = self.triangles[face_keep[:num_triangles]]
+        self.quads = self.quads[face_keep[num_triangles:]]
+        self.filter_elements("faces", face_keep)
+
+        edge_keep = subset_mask[self.edge_subset]
+
+        # only dropped edges between vertices of kept faces can be face edges,
+        # they are compared with the edges of the faces around them
+        face_vertices = np.zeros(len(self.vertices), dtype=bool)
+        face_vertices[self.triangles.ravel()] = True
+        face_vertices[self.quads.ravel()] = True
+
+        candidates = np.flatnonzero(~edge_keep)
+        candidates = candidates[np.all(face_vertices[self.edges[candidates]], axis=1)]
+
+        if len(candidates) > 0:
+            near = np.zeros(len(self.vertices), dtype=bool)
+            near[self.edges[candidates].ravel()] = True
+
+            triangles = self.triangles[np.any(near[self.triangles], axis=1)]
+            quads = self.quads[np.any(near[self.quads], axis=1)]
+
+            edge_keep[candidates] = np.isin(edge_keys(self.edges[candidates], len(self.vertices)), face_edge_keys(triangles, quads, len(self.vertices)))
+
+        self.edges = self.edges[edge_keep]
+        self.filter_elements("edges", edge_keep)
+
+    def compact(self, vertex_mask: np.ndarray) -> None:
+        """Drops unused vertices and renumbers the remaining ones.
+
+        Vertices are kept if they pass the filters or are used by a kept element.
+
+        Args:
+            vertex_mask (np.ndarray): Vertices passing the filters.
+        """
+        keep = vertex_mask.copy()
+        keep[self.edges.ravel()] = True
+        keep[self.triangles.ravel()] = True
+        keep[self.quads.ravel()] = True
+
+        remap = np.full(len(keep), -1, dtype=np.int32)
+        remap[keep] = np.arange(np.count_nonzero(keep), dtype=np.int32)
+
+        self.vertices = self.vertices[keep]
+        self.filter_elements("vertices", keep)
+
+        self.edges = remap[self.edges]
+        self.triangles = remap[self.triangles]
+        self.quads = remap[self.quads]
+
+
+    @classmethod
+    def read_preview(cls, filepath: str, num_points: int) -> "UGXGrid":
+        """Reads a lightweight proxy of a ugx file.
+
+        The proxy consists of a point cloud sampled with a fixed stride from
+        the vertices and the edges of the subsets without faces, which mark
+        boundaries and interfaces in UG4 grids. Both are limited to num_points.
+        Faces, attachments and all sections after the first subset handler
+        are skipped.
+
+        Args:
+            filepath (str): Path of the ugx file.
+            num_points (int): Maximum number of sampled vertices and boundary edges.
+
+        Returns:
+            UGXGrid: The proxy grid.
+        """
+        proxy = cls()
+        vertices = np.zeros((0, 3), dtype=np.float32)
+        edges = np.zeros((0, 2), dtype=np.int32)
+        boundary = np.zeros(0, dtype=np.int32)
+
+        for section in iter_sections(filepath):
+            if section.tag == "vertices":
+                vertices = parse_vertices(section)
+            elif section.tag == "edges":
+                edges = check_indices(parse_array(section.text, np.int32, 2), len(vertices), section.tag)
+            elif section.tag == "subset_handler":
+                proxy.subset_handler = section.get("name", "defSH")
+                proxy.subsets = [parse_subset(s) for s in section.findall("subset")]
+
+                # only the edge lists of subsets without faces are parsed
+                boundary = np.concatenate([boundary] + [parse_array(s.findtext("edges"), np.int32)
+                                                        for s in section.findall("subset") if s.find("faces") is None])
+                break
+
+        def stride(count: int) -> int:
+            return max(1, -(-count // max(1, num_points)))
+
+        boundary = edges[np.sort(check_indices(boundary, len(edges), "boundary edges"))[::stride(len(boundary))]]
+        sample = np.arange(0, len(vertices), stride(len(vertices)), dtype=np.int32)
+
+        kept = np.union1d(sample, boundary.ravel())
+
+        proxy.vertices = vertices[kept]
+        proxy.vertex_subset = np.full(len(kept), -1, dtype=np.int32)
+        proxy.vertex_select = np.zeros(len(kept), dtype=bool)
+        proxy.edges = np.searchsorted(kept, boundary).astype(np.int32)
+        proxy.edge_subset = np.full(len(boundary), -1, dtype=np.int32)
+        proxy.edge_select = np.zeros(len(boundary), dtype=bool)
+
+        return proxy
+
+    @classmethod
+    def merge(cls, grids: list) -> "UGXGrid":
+        """Merges grids into one grid, offsetting the vertex indices of each part.
+
+        Subsets and subset handlers are merged by name, attachments by name and
+        element type. Elements of parts without an attachment get zero values.
+        The projection handlers of the first part defining any are kept.
+
+        Args:
+            grids (list): The grids to merge.
+
+        Returns:
+            UGXGrid: The merged grid.
+        """
+        merged = cls()
+
+        # int32 offsets keep the merged elements int32, like the mesh buffers they are written to
+        offsets = np.cumsum([0] + [len(g.vertices) for g in grids[:-1]], dtype=np.int32)
+
+        merged.vertices = np.concatenate([g.vertices for g in grids])
+        merged.edges = np.concatenate([g.edges + o for g, o in zip(grids, offsets)])
+        merged.triangles = np.concatenate([g.triangles + o for g, o in zip(grids, offsets)])
+        merged.quads = np.concatenate([g.quads + o for g, o in zip(grids, offsets)])
+
+        def merge_subsets(parts: list) -> tuple:
+            # subset indices of every part in the merged subsets, -1 stays unassigned
+            names = {}
+            subsets = []
+            lookups = []
+            for part in parts:
+                for s in part:
+                    if s["name"] not in names:
+                        names[s["name"]] = len(subsets)
+                        subsets.append({"name": s["name"], "color": s["color"], "state": s["state"]})
+
+                lookups.append(np.array([names[s["name"]] for s in part] + [-1], dtype=np.int32))
+
+            return subsets, lookups
+
+        merged.subset_handler = grids[0].subset_handler
+        merged.subsets, lookups = merge_subsets([g.subsets for g in grids])
+        merged.projection_handlers = next((g.projection_handlers for g in grids if len(g.projection_handlers) > 0), [])
+
+        def concatenate(elements: str, arrays: list) -> np.ndarray:
+            # faces of the merged grid are ordered by type, first the triangles of all parts
+            if elements != "faces":
+                return np.concatenate(arrays)
+
+            triangles = [a[:len(g.triangles)] for g, a in zip(grids, arrays)]
+            quads = [a[len(g.triangles):] for g, a in zip(grids, arrays)]
+            return np.concatenate(triangles + quads)
+
+        for elements, key in (("vertices", "vertex"), ("edges", "edge"), ("faces", "face")):
+            setattr(merged, f"{key}_subset", concatenate(elements, [lookup[getattr(g, f"{key}_subset")] for g, lookup in zip(grids, lookups)]))
+            setattr(merged, f"{key}_select", concatenate(elements, [getattr(g, f"{key}_select") for g in grids]))
+
+        counts = {"vertices": lambda g: len(g.vertices), "edges": lambda g: len(g.edges), "faces": lambda g: g.num_faces}
+
+        # parts without a handler have all their elements unassigned
+        for name in dict.fromkeys(h["name"] for g in grids for h in g.handlers):
+            handlers = [next((h for h in g.handlers if h["name"] == name), None) for g in grids]
+            subsets, lookups = merge_subsets([h["subsets"] if h is not None else [] for h in handlers])
+
+            handler = {"name": name, "subsets": subsets}
+            for elements, key in SUBSET_KEYS.items():
+                handler[key] = concatenate(elements, [lookup[h[key]] if h is not None else np.full(counts[elements](g), -1, dtype=np.int32)
+                                                      for g, h, lookup in zip(grids, handlers, lookups)])
+
+            merged.handlers.append(handler)
+
+        attachments = {}
+        for g in grids:
+            for a in g.attachments:
+                attachments.setdefault((a["name"], a["elements"]), a)
+
+        for (name, elements), a in attachments.items():
+            parts = []
+            for g in grids:
+                values = [b["values"] for b in g.attachments if (b["name"], b["elements"]) == (name, elements)]
+                parts.append(values[0] if values else np.zeros(counts[elements](g), dtype=a["values"].dtype))
+
+            merged.attachments.append({"name": name, "type": a["type"], "elements": elements, "values": concatenate(elements, parts)})
+
+        return merged
+
+
+def read_part(read, filepath: str, *args) -> UGXGrid:
+    """Reads a grid in a worker process.
+
+    Parse errors of lxml can not be passed back to the main process, they
+    are raised as ValueError with the same message.
+
+    Args:
+        read (callable): UGXGrid.read or UGXGrid.read_preview.
+        filepath (str): Path of the ugx file.
+        *args: Further arguments of the read function.
+
+    Returns:
+        UGXGrid: The parsed grid.
+    """
+    try:
+        return read(filepath, *args)
+    except etree.XMLSyntaxError as e:
+        raise ValueError(str(e)) from None
+
+
+def edge_keys(edges: np.ndarray, num_vertices: int) -> np.ndarray:
+    """Creates an orientation independent key for every edge.
+
+    Args:
+        edges (np.ndarray): Array of shape (n, 2) with vertex indices.
+        num_vertices (int): Number of vertices of the grid.
+
+    Returns:
+        np.ndarray: One int64 key per edge.
+    """
+    edges = np.sort(edges, axis=1).astype(np.int64)
+    return edges[:, 0] * num_vertices + edges[:, 1]
+
+
+def face_edges(triangles: np.ndarray, quads: np.ndarray) -> np.ndarray:
+    """Creates the boundary edges of every face, in face and corner order.
+
+    Args:
+        triangles (np.ndarray): Array of shape (n, 3) with vertex indices.
+        quads (np.ndarray): Array of shape (m, 4) with vertex indices.
+
+    Returns:
+        np.ndarray: Array of shape (3n + 4m, 2) with vertex indices.
+    """
+    edges = [np.stack((faces, np.roll(faces, -1, axis=1)), axis=2).reshape(-1, 2) for faces in (triangles, quads)]
+    return np.concatenate(edges)
+
+
+def face_edge_keys(triangles: np.ndarray, quads: np.ndarray, num_vertices: int) -> np.ndarray:
+    """Creates the keys of all boundary edges of the given faces.
+
+    Args:
+        triangles (np.ndarray): Array of shape (n, 3) with vertex indices.
+        quads (np.ndarray): Array of shape (m, 4) with vertex indices.
+        num_vertices (int): Number of vertices of the grid.
+
+    Returns:
+        np.ndarray: Unique edge keys, see edge_keys.
+    """
+    return np.unique(edge_keys(face_edges(triangles, quads), num_vertices))
@@ -1,116 +1,220 @@
+import os
+
 import bpy
-import bmesh
 
-from lxml import etree
+from bpy.props import (BoolProperty,
+                       CollectionProperty,
+                       IntProperty,
+                       StringProperty,
+                       FloatVectorProperty)
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+
+from .lazy import LazyModule
+from .sequence import get_sequence, sequence_files
+
+# loaded on first import or export, types from these modules are annotated as strings
+np = LazyModule("numpy")
+etree = LazyModule("lxml.etree")
+ugx_grid = LazyModule(".ugx_grid", __package__)
 
 
-class UGXExporter(bpy.types.Operator):
+# Blender attribute domains and data types of the ugx attachment elements and types
+ATTACHMENT_DOMAINS = {'POINT': "vertices", 'EDGE': "edges", 'FACE': "faces"}
+ATTACHMENT_TYPES = {'FLOAT': "double", 'INT': "int"}
+
+
+class UGXExporter(bpy.types.Operator, ExportHelper):
     """Exporter class for the UGX format in Blender."""
 
     bl_idname: str = "export.ugx"
     bl_label: str = "Export UGX"
     bl_options: str = {'REGISTER', 'UNDO'}
 
-    def add_vertices(self, obj: bpy.types.Object, grid: etree.Element) -> None:
+    filename_ext: str = ".ugx"
+    filter_glob: StringProperty(default="*.ugx", options={'HIDDEN'})
+
+    use_modifiers: BoolProperty(
+        name="Apply Modifiers",
+        description="Export the mesh with its modifiers applied",
+        default=False)
+
+    attachments: StringProperty(
+        name="Attachments",
+        description="Comma separated names of float or int attributes exported as vertex, edge or face attachments",
+        default="")
+
+    def add_vertices(self, mesh: bpy.types.Mesh, grid: "etree.Element") -> None:
         """Adds vertices to the grid element in the ugx file.
 
         Args:
-            obj (bpy.types.Object): The object to export.
+            mesh (bpy.types.Mesh): The mesh to export.
             grid (lxml.etree.Element): The grid element.
         """
-        coords = ""
-        for v in obj.data.vertices:
-            for c in v.co:
-                c = int(c) if c.is_integer() else c
-                coords += str(c) + " "
+        coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coords)
 
-        etree.SubElement(grid, "vertices", coords="3").text = coords
+        etree.SubElement(grid, "vertices", coords="3").text = ugx_grid.format_array(coords)
 
-    def add_edges(self, obj: bpy.types.Object, grid: etree.Element) -> None:
+    def add_edges(self, mesh: bpy.types.Mesh, grid: "etree.Element") -> None:
         """Adds edges to the grid element in the ugx file.
 
         Args:
-            obj (bpy.types.Object): The object to export.
+            mesh (bpy.types.Mesh): The mesh to export.
             grid (lxml.etree.Element): The grid element.
         """
-        edges = ""
-        for e in obj.data.edges:
-            edges += str(e.vertices[0]) + " " + str(e.vertices[1]) + " "
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edges)
 
-        etree.SubElement(grid, "edges").text = edges
+        etree.SubElement(grid, "edges").text = ugx_grid.format_array(edges)
 
-    def add_faces(self, obj: bpy.types.Object, grid: etree.Element) -> None:
+    def add_faces(self, mesh: bpy.types.Mesh, grid: "etree.Element") -> "np.ndarray":
         """Add triangles and quads to the grid element in the ugx file.
 
+        UG4 indexes faces by type, first all triangles, then all quads. The
+        returned order maps these indices to the polygons of the mesh.
+
         Args:
-            obj (bpy.types.Object): The object to export.
+            mesh (bpy.types.Mesh): The mesh to export.
             grid (lxml.etree.Element): The grid element.
+
+        Returns:
+            np.ndarray: Polygon index of every ugx face, None if the mesh has other polygons.
         """
-        triangles = ""
-        quads = ""
-        for f in obj.data.polygons:
-            if len(f.vertices) == 3:
-                triangles += str(f.vertices[0]) + " " + str(f.vertices[1]) + " " + str(f.vertices[2]) + " "
-            elif len(f.vertices) == 4:
-                quads += str(f.vertices[0]) + " " + str(f.vertices[1]) + " " + str(f.vertices[2]) + " " + str(f.vertices[3]) + " "
-            else:
-                self.report({'ERROR'}, "Only triangles and quads are supported.")
-                return {'CANCELLED'}
+        polygons = mesh.polygons
+
+        loop_total = np.empty(len(polygons), dtype=np.int32)
+        polygons.foreach_get("loop_total", loop_total)
+
+        if np.any((loop_total != 3) & (loop_total != 4)):
+            self.report({'ERROR'}, "Only triangles and quads are supported.")
+            return None
+
+        corners = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", corners)
+
+        loop_start = np.empty(len(polygons), dtype=np.int32)
+        polygons.foreach_get("loop_start", loop_start)
+
+        triangles = np.flatnonzero(loop_total == 3)
+        quads = np.flatnonzero(loop_total == 4)
 
-        if triangles != "":
-            etree.SubElement(grid, "triangles").text = triangles
-        if quads != "":
-            etree.SubElement(grid, "quads").text = quads
+        if len(triangles) > 0:
+            etree.SubElement(grid, "triangles").text = ugx_grid.format_array(corners[loop_start[triangles, None] + np.arange(3)])
+        if len(quads) > 0:
+            etree.SubElement(grid, "quads").text = ugx_grid.format_array(corners[loop_start[quads, None] + np.arange(4)])
 
-    def add_subsets(self, obj: bpy.types.Object, grid: etree.Element) -> None:
+        return np.concatenate((triangles, quads))
+
+    def add_attachments(self, mesh: bpy.types.Mesh, grid: "etree.Element", face_order: "np.ndarray") -> None:
+        """Add the chosen attributes as attachments to the grid element in the ugx file.
+
+        Args:
+            mesh (bpy.types.Mesh): The mesh to export.
+            grid (lxml.etree.Element): The grid element.
+            face_order (np.ndarray): Polygon index of every ugx face.
+        """
+        for name in [a.strip() for a in self.attachments.split(",") if a.strip() != ""]:
+            attribute = mesh.attributes.get(name)
+
+            if attribute is None or attribute.domain not in ATTACHMENT_DOMAINS or attribute.data_type not in ATTACHMENT_TYPES:
+                self.report({'WARNING'}, f"{name} is no float or int attribute of vertices, edges or faces.")
+                continue
+
+            attachment_type = ATTACHMENT_TYPES[attribute.data_type]
+
+            values = np.empty(len(attribute.data), dtype=ugx_grid.ATTACHMENT_DTYPES[attachment_type])
+            attribute.data.foreach_get("value", values)
+
+            if attribute.domain == 'FACE':
+                values = values[face_order]
+
+            etree.SubElement(grid, ugx_grid.ATTACHMENT_TAGS[ATTACHMENT_DOMAINS[attribute.domain]], name=name, type=attachment_type,
+                             passOn="0", **{"global": "1"}).text = ugx_grid.format_array(values)
+
+    def get_layer(self, mesh: bpy.types.Mesh, name: str, count: int) -> "np.ndarray":
+        """Reads an int attribute of the mesh in bulk.
+
+        Args:
+            mesh (bpy.types.Mesh): The mesh to export.
+            name (str): Name of the attribute.
+            count (int): Number of elements of the attribute domain.
+
+        Returns:
+            np.ndarray: The values, zeros if the attribute does not exist.
+        """
+        values = np.zeros(count, dtype=np.int32)
+
+        attribute = mesh.attributes.get(name)
+        if attribute is not None:
+            attribute.data.foreach_get("value", values)
+
+        return values
+
+    def add_subset_elements(self, subsets: dict, tag: str, values: "np.ndarray") -> None:
+        """Groups elements by subset and adds them to their subset elements.
+
+        Args:
+            subsets (dict): Subset elements by subset index.
+            tag (str): Element type.
+            values (np.ndarray): Subset index of every element.
+        """
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+
+        for index, subset in subsets.items():
+            start, end = np.searchsorted(sorted_values, (index, index + 1))
+            if end > start:
+                etree.SubElement(subset, tag).text = ugx_grid.format_array(order[start:end])
+
+    def add_subsets(self, mesh: bpy.types.Mesh, grid: "etree.Element", face_order: "np.ndarray", handlers: list) -> None:
         """Add subsets to the grid element in the ugx file.
 
+        Name and subset states of the handler are taken from the imported
+        handlers, if the mesh was imported from a ugx file.
+
         Args:
-            obj (bpy.types.Object): The object to export.
+            mesh (bpy.types.Mesh): The mesh to export.
             grid (lxml.etree.Element): The grid element.
+            face_order (np.ndarray): Polygon index of every ugx face.
+            handlers (list): Imported subset handlers, the first one is the subset handler of the scene subsets.
         """
+        name = handlers[0]["name"] if len(handlers) > 0 else "defSH"
+        states = {s["name"]: s["state"] for s in handlers[0]["subsets"]} if len(handlers) > 0 else {}
+
         # add subset handler
-        subset_handler = etree.SubElement(grid, "subset_handler", name="defSH")
+        subset_handler = etree.SubElement(grid, "subset_handler", name=name)
 
         subsets = {}
         # add subsets
         for s in bpy.context.scene.ugx_subsets:
-            coords = ""
-            for c in tuple(s.color):
-                c = int(c) if c.is_integer() else c
-                coords += str(c) + " "
-            subsets[s.index] = {"main" : etree.SubElement(subset_handler, "subset", name=s.name, color=coords, state="393216")}
-
-        bm = bmesh.from_edit_mesh(obj.data)
-
-        s = bm.verts.layers.int.get("vertex_subset")
-        for v in bm.verts:
-            if "vertices" in subsets[bm.verts[v.index][s]].keys():
-                subsets[bm.verts[v.index][s]]["vertices"].text += str(v.index) + " "
-            else:
-                sub = etree.SubElement(subsets[bm.verts[v.index][s]]["main"], "vertices")
-                sub.text = str(v.index) + " "
-                subsets[bm.verts[v.index][s]]["vertices"] = sub
-
-        s = bm.edges.layers.int.get("edge_subset")
-        for e in bm.edges:
-            if "edges" in subsets[bm.edges[e.index][s]].keys():
-                subsets[bm.edges[e.index][s]]["edges"].text += str(e.index) + " "
-            else:
-                sub = etree.SubElement(subsets[bm.edges[e.index][s]]["main"], "edges")
-                sub.text = str(e.index) + " "
-                subsets[bm.edges[e.index][s]]["edges"] = sub
-
-        s = bm.faces.layers.int.get("face_subset")
-        for f in bm.faces:
-            if "faces" in subsets[bm.faces[f.index][s]].keys():
-                subsets[bm.faces[f.index][s]]["faces"].text += str(f.index) + " "
-            else:
-                sub = etree.SubElement(subsets[bm.faces[f.index][s]]["main"], "faces")
-                sub.text = str(f.index) + " "
-                subsets[bm.faces[f.index][s]]["faces"] = sub
-
-    def add_mark_subset_handler(self, grid: etree.Element) -> None:
+            subsets[s.index] = etree.SubElement(subset_handler, "subset", name=s.name, color=ugx_grid.format_array(s.color), state=states.get(s.name, "393216"))
+
+        self.add_subset_elements(subsets, "vertices", self.get_layer(mesh, "vertex_subset", len(mesh.vertices)))
+        self.add_subset_elements(subsets, "edges", self.get_layer(mesh, "edge_subset", len(mesh.edges)))
+        self.add_subset_elements(subsets, "faces", self.get_layer(mesh, "face_subset", len(mesh.polygons))[face_order])
+
+    def add_subset_handlers(self, mesh: bpy.types.Mesh, grid: "etree.Element", face_order: "np.ndarray", handlers: list) -> None:
+        """Add the further imported subset handlers to the grid element in the ugx file.
+
+        Args:
+            mesh (bpy.types.Mesh): The mesh to export.
+            grid (lxml.etree.Element): The grid element.
+            face_order (np.ndarray): Polygon index of every ugx face.
+            handlers (list): Imported subset handlers, the first one is skipped.
+        """
+        for h in handlers[1:]:
+            subset_handler = etree.SubElement(grid, "subset_handler", name=h["name"])
+
+            subsets = {}
+            for i, s in enumerate(h["subsets"]):
+                subsets[i] = etree.SubElement(subset_handler, "subset", name=s["name"], color=ugx_grid.format_array(s["color"]), state=s["state"])
+
+            # the layers store the subset index plus one, so new elements (0) stay unassigned (-1)
+            self.add_subset_elements(subsets, "vertices", self.get_layer(mesh, f"{h['name']}_vertex_subset", len(mesh.vertices)) - 1)
+            self.add_subset_elements(subsets, "edges", self.get_layer(mesh, f"{h['name']}_edge_subset", len(mesh.edges)) - 1)
+            self.add_subset_elements(subsets, "faces", self.get_layer(mesh, f"{h['name']}_face_subset", len(mesh.polygons))[face_order] - 1)
+
+    def add_mark_subset_handler(self, grid: "etree.Element") -> None:
         """Add mark subset handler to the grid element in the ugx file.
 
         Args:
@@ -123,49 +227,40 @@ class UGXExporter(bpy.types.Operator):
         etree.SubElement(mark_subset_handler, "subset", name="crease", color="1 1 1 1", state="0")
         etree.SubElement(mark_subset_handler, "subset", name="fixed", color="1 1 1 1", state="0")
 
-    def add_selector(self, obj: bpy.types.Object, grid: etree.Element) -> None:
+    def add_selector(self, mesh: bpy.types.Mesh, grid: "etree.Element", face_order: "np.ndarray") -> None:
         """Add selector to the grid element in the ugx file.
 
         Args:
-            obj (bpy.types.Object): The object to export.
+            mesh (bpy.types.Mesh): The mesh to export.
             grid (lxml.etree.Element): The grid element.
+            face_order (np.ndarray): Polygon index of every ugx face.
         """
         # the selector saves the current selection
         selector = etree.SubElement(grid, "selector", name="defSel")
 
-        # add vertices
-        vertices = ""
-        for v in obj.data.vertices:
-            if v.select:
-                vertices += str(v.index) + " "
-
-        if vertices != "":
-            etree.SubElement(selector, "vertices").text = vertices
-
-        # add edges
-        edges = ""
-        for e in obj.data.edges:
-            if e.select:
-                edges += str(e.index) + " "
+        for tag, elements in (("vertices", mesh.vertices), ("edges", mesh.edges), ("faces", mesh.polygons)):
+            select = np.zeros(len(elements), dtype=bool)
+            elements.foreach_get("select", select)
 
-        if edges != "":
-            etree.SubElement(selector, "edges").text = edges
+            if tag == "faces":
+                select = select[face_order]
 
-        # add faces
-        faces = ""
-        for f in obj.data.polygons:
-            if f.select:
-                faces += str(f.index) + " "
+            if np.any(select):
+                etree.SubElement(selector, tag).text = ugx_grid.format_array(np.flatnonzero(select))
 
-        if faces != "":
-            etree.SubElement(selector, "faces").text = faces
-
-    def add_projection_handler(self, grid: etree.Element) -> None:
+    def add_projection_handler(self, grid: "etree.Element", projection_handlers: str) -> None:
         """Add projection handler to the grid element in the ugx file.
 
+        Imported projection handlers are written back unchanged.
+
         Args:
             grid (lxml.etree.Element): The grid element.
+            projection_handlers (str): Imported projection handlers as xml, empty if none.
         """
+        if projection_handlers != "":
+            grid.extend(list(etree.fromstring(f"<handlers>{projection_handlers}</handlers>")))
+            return
+
         # add projection handler
         projection_handler = etree.SubElement(grid, "projection_handler", name="defPH")
 
@@ -173,6 +268,41 @@ class UGXExporter(bpy.types.Operator):
         default = etree.SubElement(projection_handler, "default", type="default")
         default.text = "0 0"
 
+    def create_grid(self, mesh: bpy.types.Mesh, handlers: list, projection_handlers: str) -> "etree.Element":
+        """Creates the grid element of the ugx file.
+
+        Args:
+            mesh (bpy.types.Mesh): The mesh to export.
+            handlers (list): Imported subset handlers.
+            projection_handlers (str): Imported projection handlers as xml.
+
+        Returns:
+            lxml.etree.Element: The grid element, None if the mesh can not be exported.
+        """
+        # start of the xml file
+        grid = etree.Element("grid", name="defGrid")
+
+        self.add_vertices(mesh, grid)
+        self.add_edges(mesh, grid)
+
+        face_order = self.add_faces(mesh, grid)
+        if face_order is None:
+            return None
+
+        self.add_attachments(mesh, grid, face_order)
+
+        self.add_subsets(mesh, grid, face_order, handlers)
+
+        self.add_subset_handlers(mesh, grid, face_order, handlers)
+        if "markSH" not in [h["name"] for h in handlers]:
+            self.add_mark_subset_handler(grid)
+
+        self.add_selector(mesh, grid, face_order)
+
+        self.add_projection_handler(grid, projection_handlers)
+
+        return grid
+
     def execute(self, context: bpy.types.Context) -> set:
         """Execute the export.
 
@@ -182,161 +312,347 @@ class UGXExporter(bpy.types.Operator):
         Returns:
             set: The result status of the export.
         """
-        scene = context.scene
-        cursor = scene.cursor.location
         obj = context.active_object
 
-        # start of the xml file
-        grid = etree.Element("grid", name="defGrid")
+        # write changes of the edit mode to the mesh
+        obj.update_from_editmode()
 
-        self.add_vertices(obj, grid)
-        self.add_edges(obj, grid)
-        self.add_faces(obj, grid)
+        # handlers of an imported ugx file, stored with the original mesh
+        handlers = [h.to_dict() for h in obj.data.get("ugx_subset_handlers", [])]
+        projection_handlers = obj.data.get("ugx_projection_handlers", "")
 
-        self.add_subsets(obj, grid)
+        if self.use_modifiers:
+            # temporary mesh of the evaluated object, freed right after the export
+            depsgraph = context.evaluated_depsgraph_get()
+            obj_eval = obj.evaluated_get(depsgraph)
+            mesh = obj_eval.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
+        else:
+            mesh = obj.data
 
-        self.add_mark_subset_handler(obj, grid)
+        try:
+            grid = self.create_grid(mesh, handlers, projection_handlers)
+        finally:
+            if self.use_modifiers:
+                obj_eval.to_mesh_clear()
 
-        self.add_selector(obj, grid)
-
-        self.add_projection_handler(obj, grid)
+        if grid is None:
+            return {'CANCELLED'}
 
         # write to file
         tree = etree.ElementTree(grid)
-        tree.write("/home/nordegraf/bwSyncShare/Projekte/blender_io_mesh_ugx/test.xml", pretty_print=True)
+        tree.write(self.filepath, pretty_print=True)
 
         self.report({'INFO'}, "File written.")
 
         return {'FINISHED'}
 
-class UGXImporter(bpy.types.Operator):
-    """Importer class for the UGX format."""
-    bl_idname: str = "import.ugx"
-    bl_label: str = "Import UGX"
-    bl_options: str = {'REGISTER', 'UNDO'}
+class UGXMeshBuilder:
+    """Creates Blender meshes from parsed ugx grids."""
 
-    def get_vertices(self, grid: etree.Element, bm: bmesh.types.BMesh) -> None:
-        """Gets the vertices from the ugx file.
+    def create_mesh(self, grid: "ugx_grid.UGXGrid", mesh: bpy.types.Mesh) -> None:
+        """Fills the mesh with the vertices, edges and faces of the grid.
 
         Args:
-            grid (lxml.etree.Element): The grid element.
-            bm (bmesh.types.BMesh): The bmesh object.
+            grid (UGXGrid): The parsed grid.
+            mesh (bpy.types.Mesh): The mesh to fill.
         """
-        verts = grid.findtext("vertices").split(" ")
-        verts = [float(v) for v in verts]
+        mesh.vertices.add(len(grid.vertices))
+        mesh.vertices.foreach_set("co", grid.vertices.ravel())
+
+        mesh.edges.add(len(grid.edges))
+        mesh.edges.foreach_set("vertices", grid.edges.ravel())
+
+        corners = np.concatenate((grid.triangles.ravel(), grid.quads.ravel()))
+        loop_total = np.concatenate((np.full(len(grid.triangles), 3, dtype=np.int32), np.full(len(grid.quads), 4, dtype=np.int32)))
+        loop_start = (np.cumsum(loop_total) - loop_total).astype(np.int32)
 
-        num_verts = len(verts) // 3
+        mesh.loops.add(len(corners))
+        mesh.loops.foreach_set("vertex_index", corners)
 
-        for i in range(num_verts):
-            v = bm.verts.new(verts[i*3:(i+1)*3])
-            v.index = i
+        mesh.polygons.add(grid.num_faces)
+        mesh.polygons.foreach_set("loop_start", loop_start)
+        if bpy.app.version < (4, 0, 0):
+            mesh.polygons.foreach_set("loop_total", loop_total)
 
-    def get_edges(self, grid: etree.Element, bm: bmesh.types.BMesh) -> None:
-        """Gets the edges from the ugx file.
+        # ugx files store all edges, they only have to be calculated if missing
+        mesh.update(calc_edges=len(grid.edges) == 0 and grid.num_faces > 0)
+
+    def get_subsets(self, grid: "ugx_grid.UGXGrid", mesh: bpy.types.Mesh, scene: bpy.types.Scene) -> None:
+        """Gets the subsets from the parsed grid.
 
         Args:
-            grid (lxml.etree.Element): The grid element.
-            bm (bmesh.types.BMesh): The bmesh object.
+            grid (UGXGrid): The parsed grid.
+            mesh (bpy.types.Mesh): The mesh.
+            scene (bpy.types.Scene): The scene.
         """
-        edges = grid.findtext("edges").split(" ")
-        edges = [int(e) for e in edges]
+        # subsets are shared by all objects of the scene and matched by name
+        indices = {s.name: s.index for s in scene.ugx_subsets}
+        lookup = []
+
+        for s in grid.subsets:
+            if s["name"] not in indices:
+                subset = scene.ugx_subsets.add()
+                subset.name = s["name"]
+                subset.color = s["color"]
+                subset.index = len(scene.ugx_subsets) - 1
+                indices[s["name"]] = subset.index
+
+            lookup.append(indices[s["name"]])
+
+        # unassigned elements (-1) are put into the first subset, like after initializing subsets
+        lookup = np.array(lookup + [0], dtype=np.int32)
+
+        layers = (("vertex_subset", 'POINT', grid.vertex_subset, len(mesh.vertices)),
+                  ("edge_subset", 'EDGE', grid.edge_subset, len(mesh.edges)),
+                  ("face_subset", 'FACE', grid.face_subset, len(mesh.polygons)))
+
+        for name, domain, values, count in layers:
+            data = np.zeros(count, dtype=np.int32)
+            data[:len(values)] = lookup[values]
 
-        num_edges = len(edges) // 2
+            mesh.attributes.new(name, 'INT', domain).data.foreach_set("value", data)
 
-        for i in range(num_edges):
-            bm.edges.new([bm.verts[edges[i*2]], bm.verts[edges[i*2+1]]])
+    def get_subset_handlers(self, grid: "ugx_grid.UGXGrid", mesh: bpy.types.Mesh) -> None:
+        """Gets all further subset handlers and the projection handlers from the parsed grid.
 
-    def get_triangles(self, grid: etree.Element, bm: bmesh.types.BMesh) -> None:
-        """Gets the triangles from the ugx file.
+        Each further handler gets its own int attributes, e.g. markSH_edge_subset,
+        storing the subset index plus one. Elements added in Blender get 0
+        and stay unassigned.
+        The handler names and subset definitions are registered with the mesh,
+        so the exporter can write them back.
 
         Args:
-            grid (lxml.etree.Element): The grid element.
-            bm (bmesh.types.BMesh): The bmesh object.
+            grid (UGXGrid): The parsed grid.
+            mesh (bpy.types.Mesh): The mesh.
         """
+        def definitions(subsets: list) -> list:
+            return [{"name": s["name"], "color": s["color"], "state": s["state"]} for s in subsets]
+
+        handlers = [{"name": grid.subset_handler, "subsets": definitions(grid.subsets)}]
+
+        for h in grid.handlers:
+            handlers.append({"name": h["name"], "subsets": definitions(h["subsets"])})
 
-        triangles = grid.findtext("triangles").split(" ")
-        triangles = [int(t) for t in triangles]
+            layers = (("vertex_subset", 'POINT', len(mesh.vertices)),
+                      ("edge_subset", 'EDGE', len(mesh.edges)),
+                      ("face_subset", 'FACE', len(mesh.polygons)))
 
-        num_triangles = len(triangles) // 3
+            for key, domain, count in layers:
+                data = np.zeros(count, dtype=np.int32)
+                data[:len(h[key])] = h[key] + 1
 
-        for i in range(num_triangles):
-            bm.faces.new([bm.verts[triangles[i*3]], bm.verts[triangles[i*3+1]], bm.verts[triangles[i*3+2]]])
+                mesh.attributes.new(f"{h['name']}_{key}", 'INT', domain).data.foreach_set("value", data)
 
-    def get_quads(self, grid: etree.Element, bm: bmesh.types.BMesh) -> None:
-        """Gets the quads from the ugx file.
+        mesh["ugx_subset_handlers"] = handlers
+        mesh["ugx_projection_handlers"] = "\n".join(grid.projection_handlers)
+
+    def get_attachments(self, grid: "ugx_grid.UGXGrid", mesh: bpy.types.Mesh) -> list:
+        """Gets the attachments from the parsed grid as float or int attributes.
 
         Args:
-            grid (lxml.etree.Element): The grid element.
-            bm (bmesh.types.BMesh): The bmesh object.
+            grid (UGXGrid): The parsed grid.
+            mesh (bpy.types.Mesh): The mesh.
+
+        Returns:
+            list: Names of the attachments not matching an existing attribute of the mesh.
         """
-        quads = grid.findtext("quads").split(" ")
-        quads = [int(q) for q in quads]
+        domains = {elements: domain for domain, elements in ATTACHMENT_DOMAINS.items()}
+        skipped = []
+
+        for a in grid.attachments:
+            domain = domains[a["elements"]]
+            data_type = 'INT' if a["values"].dtype.kind == 'i' else 'FLOAT'
 
-        num_quads = len(quads) // 4
+            attribute = mesh.attributes.get(a["name"]) or mesh.attributes.new(a["name"], data_type, domain)
+            if attribute.domain != domain or attribute.data_type != data_type or len(attribute.data) < len(a["values"]):
+                skipped.append(a["name"])
+                continue
 
-        for i in range(num_quads):
-            bm.faces.new([bm.verts[quads[i*4]], bm.verts[quads[i*4+1]], bm.verts[quads[i*4+2]], bm.verts[quads[i*4+3]]])
+            values = np.zeros(len(attribute.data), dtype=a["values"].dtype)
+            values[:len(a["values"])] = a["values"]
 
-    def get_subsets(self, grid: etree.Element, bm: bmesh.types.BMesh, scene: bpy.types.Scene) -> None:
-        """Gets the subsets from the ugx file.
+            attribute.data.foreach_set("value", values)
+
+        return skipped
+
+    def get_selector(self, grid: "ugx_grid.UGXGrid", mesh: bpy.types.Mesh) -> None:
+        """Gets the selection from the parsed grid.
 
         Args:
-            grid (lxml.etree.Element): The grid element.
-            bm (bmesh.types.BMesh): The bmesh object.
-            scene (bpy.types.Scene): The scene.
+            grid (UGXGrid): The parsed grid.
+            mesh (bpy.types.Mesh): The mesh.
         """
-        subsets = grid.find("subset_handler").findall("subset")
+        mesh.vertices.foreach_set("select", grid.vertex_select)
 
-        vertex_subset = bm.verts.layers.int.new("vertex_subset")
-        edge_subset = bm.edges.layers.int.new("edge_subset")
-        face_subset = bm.faces.layers.int.new("face_subset")
+        edge_select = np.zeros(len(mesh.edges), dtype=bool)
+        edge_select[:len(grid.edge_select)] = grid.edge_select
+        mesh.edges.foreach_set("select", edge_select)
 
-        bm.verts.ensure_lookup_table()
-        bm.edges.ensure_lookup_table()
-        bm.faces.ensure_lookup_table()
+        mesh.polygons.foreach_set("select", grid.face_select)
 
-        i = 0
-        for s in subsets:
-            name = s.get("name")
-            color = s.get("color")
 
-            subset = scene.ugx_subsets.add()
-            subset.name = name
-            subset.color = [float(c) for c in color.split(" ")]
-            subset.index = i
+class UGXImporter(bpy.types.Operator, ImportHelper, UGXMeshBuilder):
+    """Importer class for the UGX format."""
+    bl_idname: str = "import.ugx"
+    bl_label: str = "Import UGX"
+    bl_options: str = {'REGISTER', 'UNDO'}
 
-            if s.findtext("vertices") is not None:
-                for v in s.findtext("vertices").split(" "):
-                    bm.verts[int(v)][vertex_subset] = i
+    filename_ext: str = ".ugx"
+    filter_glob: StringProperty(default="*.ugx", options={'HIDDEN'})
 
-            if s.findtext("edges") is not None:
-                for e in s.findtext("edges").split(" "):
-                    bm.edges[int(e)][edge_subset] = i
+    files: CollectionProperty(type=bpy.types.OperatorFileListElement, options={'HIDDEN', 'SKIP_SAVE'})
+    directory: StringProperty(subtype='DIR_PATH', options={'HIDDEN', 'SKIP_SAVE'})
 
-            if s.findtext("triangles") is not None:
-                for t in s.findtext("triangles").split(" "):
-                    bm.faces[int(t)][face_subset] = i
+    merge: BoolProperty(
+        name="Merge",
+        description="Merge all selected files into one object",
+        default=False)
 
-            if s.findtext("quads") is not None:
-                for q in s.findtext("quads").split(" "):
-                    bm.faces[int(q)][face_subset] = i
+    subset_filter: StringProperty(
+        name="Subsets",
+        description="Comma separated names of the subsets to import, empty to import all subsets",
+        default="")
 
-            i += 1
+    use_bbox: BoolProperty(
+        name="Bounding Box",
+        description="Only import elements whose vertices lie inside the bounding box",
+        default=False)
 
+    bbox_min: FloatVectorProperty(name="Min", size=3, subtype='XYZ', default=(-1.0, -1.0, -1.0))
+    bbox_max: FloatVectorProperty(name="Max", size=3, subtype='XYZ', default=(1.0, 1.0, 1.0))
 
-    def get_selector(self, grid: etree.Element) -> None:
-        """Gets the selector from the ugx file.
+    preview: BoolProperty(
+        name="Preview",
+        description="Only import a point cloud and the subset boundaries, the full resolution with the filters applied can be loaded later",
+        default=False)
+
+    preview_points: IntProperty(
+        name="Preview Points",
+        description="Maximum number of vertices and boundary edges sampled for the preview",
+        default=100000,
+        min=1)
+
+    sequence: BoolProperty(
+        name="Sequence",
+        description="Import the file as time series with fixed topology, the vertices of the other time steps are loaded on frame change",
+        default=False)
+
+    def get_filters(self) -> tuple:
+        """Gets the subset and bounding box filters of the import.
+
+        Returns:
+            tuple: Set of subset names and bounding box, each None if not used.
+        """
+        subsets = {s.strip() for s in self.subset_filter.split(",") if s.strip() != ""}
+        subsets = subsets if len(subsets) > 0 else None
+
+        bbox = (tuple(self.bbox_min), tuple(self.bbox_max)) if self.use_bbox else None
+
+        return subsets, bbox
+
+    def get_paths(self) -> list:
+        """Gets the paths of all selected files.
+
+        Returns:
+            list: The file paths.
+        """
+        paths = [os.path.join(self.directory, f.name) for f in self.files if f.name != ""]
+
+        return paths if len(paths) > 0 else [self.filepath]
+
+    def read_grids(self, paths: list, subsets: set, bbox: tuple):
+        """Parses the files, multiple files in parallel processes.
+
+        Files which can not be read are reported and skipped.
 
         Args:
-            grid (lxml.etree.Element): The grid element.
+            paths (list): The file paths.
+            subsets (set): Names of the subsets to keep, None to keep all.
+            bbox (tuple): (min, max) corners of the box to keep, None to keep all.
+
+        Yields:
+            tuple: File path and parsed grid, in the order parsing finishes.
         """
-        selector = grid.find("selector")
+        # previews are read without filters, these are applied when the full resolution is loaded
+        if self.preview:
+            read, args = ugx_grid.UGXGrid.read_preview, (self.preview_points, )
+        else:
+            read, args = ugx_grid.UGXGrid.read, (subsets, bbox)
+
+        if len(paths) == 1:
+            try:
+                grid = read(paths[0], *args)
+            except Exception as e:
+                self.report({'WARNING'}, f"{paths[0]}: {e}")
+                return
+
+            yield paths[0], grid
+            return
+
+        # imported on first use, like the parser, and spawned instead of forking Blender with all its threads
+        import multiprocessing
+
+        from concurrent.futures import ProcessPoolExecutor, as_completed
 
-        vertices = selector.findtext("vertices")
-        edges = selector.findtext("edges")
-        faces = selector.findtext("faces")
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1), mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {executor.submit(ugx_grid.read_part, read, path, *args): path for path in paths}
 
-        print(vertices, edges, faces)
+            for future in as_completed(futures):
+                # a broken file or a crashed worker only fails its own part
+                try:
+                    grid = future.result()
+                except Exception as e:
+                    self.report({'WARNING'}, f"{futures[future]}: {e}")
+                    continue
+
+                yield futures[future], grid
+
+    def import_grid(self, context: bpy.types.Context, filepath: str, grid: "ugx_grid.UGXGrid") -> None:
+        """Creates an object of a parsed grid.
+
+        Args:
+            context (bpy.types.Context): The context.
+            filepath (str): Path of the parsed file.
+            grid (UGXGrid): The parsed grid.
+        """
+        scene = context.scene
+        name = os.path.splitext(os.path.basename(filepath))[0]
+
+        mesh = bpy.data.meshes.new(name)
+        obj = bpy.data.objects.new(name, mesh)
+        scene.collection.objects.link(obj)
+
+        if self.preview:
+            self.create_mesh(grid, mesh)
+
+            # remember the import settings, so the full resolution can be loaded in place
+            obj["ugx_preview"] = filepath
+            obj["ugx_subset_filter"] = self.subset_filter
+            if self.use_bbox:
+                obj["ugx_bbox"] = [*self.bbox_min, *self.bbox_max]
+
+            return
+
+        self.create_mesh(grid, mesh)
+        self.get_subsets(grid, mesh, scene)
+        self.get_subset_handlers(grid, mesh)
+        skipped = self.get_attachments(grid, mesh)
+        self.get_selector(grid, mesh)
+
+        if len(skipped) > 0:
+            self.report({'WARNING'}, f"{name}: attachments {', '.join(skipped)} do not match the mesh and are skipped.")
+
+        if self.sequence:
+            # the imported file is shown at the current frame
+            files = sequence_files(filepath)
+            obj["ugx_sequence"] = filepath
+            obj["ugx_sequence_start"] = scene.frame_current - files.index(filepath)
+
+            sequence = get_sequence(obj)
+            if sequence is not None:
+                sequence.current = (files.index(filepath), os.stat(filepath).st_mtime)
+
+            self.report({'INFO'}, f"Sequence of {len(files)} files imported.")
 
     def execute(self, context: bpy.types.Context) -> set:
         """Executes the import.
@@ -347,31 +663,86 @@ class UGXImporter(bpy.types.Operator):
         Returns:
             set: The result.
         """
-        scene = context.scene
-        mesh = bpy.data.meshes.new("UGXMesh")
-        obj = bpy.data.objects.new("UGXObject", mesh)
-        scene.collection.objects.link(obj)
-        tree = etree.parse("/home/nordegraf/bwSyncShare/Projekte/blender_io_mesh_ugx/henry.ugx")
+        subsets, bbox = self.get_filters()
+        paths = self.get_paths()
+
+        if self.sequence and (self.preview or len(paths) > 1 or subsets is not None or bbox is not None):
+            self.report({'ERROR'}, "Sequences can not be imported as preview, filtered or from multiple files.")
+            return {'CANCELLED'}
+
+        if self.merge and len(paths) > 1:
+            if self.preview:
+                self.report({'ERROR'}, "Merged files can not be imported as preview.")
+                return {'CANCELLED'}
+
+            grids = dict(self.read_grids(paths, subsets, bbox))
+            if len(grids) == 0:
+                return {'CANCELLED'}
+
+            self.import_grid(context, paths[0], ugx_grid.UGXGrid.merge([grids[p] for p in paths if p in grids]))
+        else:
+            # meshes are created as soon as their file is parsed
+            imported = 0
+            for path, grid in self.read_grids(paths, subsets, bbox):
+                self.import_grid(context, path, grid)
+                imported += 1
+
+            if imported == 0:
+                return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+
+class UGXLoadFullResolution(bpy.types.Operator, UGXMeshBuilder):
+    """Replaces a ugx preview with the full resolution grid"""
+    bl_idname: str = "import.ugx_full_resolution"
+    bl_label: str = "Load Full Resolution"
+    bl_options: str = {'REGISTER', 'UNDO'}
 
-        grid = tree.getroot()
+    @classmethod
+    def poll(cls, context: bpy.types.Context) -> bool:
+        return context.active_object is not None and "ugx_preview" in context.active_object
+
+    def execute(self, context: bpy.types.Context) -> set:
+        """Loads the full grid into the preview object.
+
+        Args:
+            context (bpy.types.Context): The context.
+
+        Returns:
+            set: The result.
+        """
+        obj = context.active_object
 
-        bm = bmesh.new()
+        subsets = {s.strip() for s in obj.get("ugx_subset_filter", "").split(",") if s.strip() != ""}
+        bbox = obj.get("ugx_bbox")
+        bbox = (tuple(bbox[:3]), tuple(bbox[3:])) if bbox is not None else None
 
-        self.get_vertices(grid, bm)
-        bm.verts.ensure_lookup_table()
+        # the proxy stays in place if the file can not be read
+        try:
+            grid = ugx_grid.UGXGrid.read(obj["ugx_preview"], subsets=subsets if len(subsets) > 0 else None, bbox=bbox)
+        except Exception as e:
+            self.report({'ERROR'}, f"{obj['ugx_preview']}: {e}")
+            return {'CANCELLED'}
 
-        self.get_edges(grid, bm)
+        mesh = bpy.data.meshes.new(obj.data.name)
+        self.create_mesh(grid, mesh)
+        self.get_subsets(grid, mesh, context.scene)
+        self.get_subset_handlers(grid, mesh)
+        skipped = self.get_attachments(grid, mesh)
+        self.get_selector(grid, mesh)
 
-        if grid.find("triangles") is not None:
-            self.get_triangles(grid, bm)
+        if len(skipped) > 0:
+            self.report({'WARNING'}, f"Attachments {', '.join(skipped)} do not match the mesh and are skipped.")
 
-        if grid.find("quads") is not None:
-            self.get_quads(grid, bm)
+        proxy = obj.data
+        obj.data = mesh
+        bpy.data.meshes.remove(proxy)
 
-        self.get_subsets(grid, bm, scene)
-        self.get_selector(grid, bm)
+        for key in ("ugx_preview", "ugx_subset_filter", "ugx_bbox"):
+            if key in obj:
+                del obj[key]
 
-        bm.to_mesh(mesh)
-        bm.free()
+        self.report({'INFO'}, "Full resolution loaded.")
 
         return {'FINISHED'}
@@ -1,16 +1,39 @@
 import bpy
-import gpu
-from gpu_extras.batch import batch_for_shader
 import bmesh
 
 
 class ViewportDrawing:
     def __init__(self) -> None:
-        self.shader = gpu.shader.from_builtin('3D_SMOOTH_COLOR')
+        # the shader is compiled on first draw, so no gpu context is needed before
+        self._shader = None
         self.draw_handler= []
+
+    @property
+    def shader(self):
+        if self._shader is None:
+            import gpu
+            self._shader = gpu.shader.from_builtin('3D_SMOOTH_COLOR')
+
+        return self._shader
+
+    def draw_batch(self, primitive: str, content: dict) -> None:
+        """Draws a batch with the subset colors.
+
+        Args:
+            primitive (str): Type of the drawn primitives.
+            content (dict): Vertex positions and colors.
+        """
+        import gpu
+        from gpu_extras.batch import batch_for_shader
+
         gpu.state.line_width_set(2)
         gpu.state.point_size_set(5)
 
+        batch = batch_for_shader(self.shader, primitive, content)
+
+        self.shader.bind()
+        batch.draw(self.shader)
+
     def create_draw_handler(self, obj: bpy.types.Object) -> None:
         """Creates the draw handler for the given object.
 
@@ -34,10 +57,7 @@ class ViewportDrawing:
 
         col = [tuple(bpy.context.scene.ugx_subsets[v[vertex_subset]].color) for v in bm.verts]
 
-        batch = batch_for_shader(self.shader, 'POINTS', {"pos": vertices_coord, "color": col})
-
-        self.shader.bind()
-        batch.draw(self.shader)
+        self.draw_batch('POINTS', {"pos": vertices_coord, "color": col})
 
     def draw_edges(self, obj: bpy.types.Object) -> None:
         """Visualizes the subsets of the edges of the given object.
@@ -61,10 +81,7 @@ class ViewportDrawing:
             col.append(tuple(bpy.context.scene.ugx_subsets[edge[edges_subset]].color))
             col.append(tuple(bpy.context.scene.ugx_subsets[edge[edges_subset]].color))
 
-        batch = batch_for_shader(self.shader, 'LINES', {"pos": vertices, "color": col})
-
-        self.shader.bind()
-        batch.draw(self.shader)
+        self.draw_batch('LINES', {"pos": vertices, "color": col})
 
     def draw_faces(self, obj: bpy.types.Object) -> None:
         """Visualizes the subsets of the faces of the given object.
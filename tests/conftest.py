@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the addon package lives in the repository root, ugx_grid imports without Blender
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
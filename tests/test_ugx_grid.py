@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from io_ugx.ugx_grid import UGXGrid
+
+
+# two triangles left of x = 1, two quads right of it, faces 0 and 1 are the triangles, 2 and 3 the quads
+#
+#   2 --- 3 --- 5 --- 7
+#   |  \  |     |     |
+#   0 --- 1 --- 4 --- 6
+GRID = """<?xml version="1.0" encoding="utf-8"?>
+<grid name="defGrid">
+<vertices coords="3">0 0 0 1 0 0 0 1 0 1 1 0 2 0 0 2 1 0 3 0 0 3 1 0</vertices>
+<edges>0 1 1 2 2 0 1 3 3 2 1 4 4 5 5 3 4 6 6 7 7 5</edges>
+<triangles>0 1 2 1 3 2</triangles>
+<quads>1 4 5 3 4 6 7 5</quads>
+<vertex_attachment name="temp" type="double" passOn="0" global="1">0 10 20 30 40 50 60 70</vertex_attachment>
+<edge_attachment name="weight" type="int" passOn="0" global="1">0 1 2 3 4 5 6 7 8 9 10</edge_attachment>
+<face_attachment name="id" type="int" passOn="0" global="1">0 1 2 3</face_attachment>
+<subset_handler name="defSH">
+<subset name="left" color="1 0 0 1" state="0"><vertices>0 2</vertices><edges>0 1 2 3 4</edges><faces>0 1</faces></subset>
+<subset name="right" color="0 0 1 1" state="0"><vertices>1 3 4 5 6 7</vertices><edges>5 6 7 8 9 10</edges><faces>2 3</faces></subset>
+</subset_handler>
+<subset_handler name="markSH">
+<subset name="crease" color="1 1 1 1" state="0"><edges>8</edges><faces>1 3</faces></subset>
+</subset_handler>
+<selector name="defSel"><vertices>0 6</vertices><edges>3 8</edges><faces>0 3</faces></selector>
+<projection_handler name="defPH" subset_handler="defSH"><default type="default">0 0</default></projection_handler>
+</grid>
+"""
+
+# a single triangle in a subset of its own and in one shared with GRID
+PART = """<?xml version="1.0" encoding="utf-8"?>
+<grid name="defGrid">
+<vertices coords="2">0 0 1 0 0 1</vertices>
+<edges>0 1 1 2 2 0</edges>
+<triangles>0 1 2</triangles>
+<face_attachment name="id" type="int" passOn="0" global="1">5</face_attachment>
+<subset_handler name="defSH">
+<subset name="inner" color="0 1 0 1" state="0"><vertices>0 1 2</vertices><edges>0 1 2</edges><faces>0</faces></subset>
+<subset name="right" color="0 0 1 1" state="0"></subset>
+</subset_handler>
+</grid>
+"""
+
+
+def write(tmp_path, name: str, text: str) -> str:
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def attachment(grid: UGXGrid, name: str) -> np.ndarray:
+    return next(a["values"] for a in grid.attachments if a["name"] == name)
+
+
+def test_read(tmp_path):
+    grid = UGXGrid.read(write(tmp_path, "grid.ugx", GRID))
+
+    assert grid.vertices.shape == (8, 3)
+    assert (len(grid.edges), len(grid.triangles), len(grid.quads)) == (11, 2, 2)
+    assert [s["name"] for s in grid.subsets] == ["left", "right"]
+    np.testing.assert_array_equal(grid.face_subset, [0, 0, 1, 1])
+    np.testing.assert_array_equal(grid.handlers[0]["face_subset"], [-1, 0, -1, 0])
+    np.testing.assert_array_equal(np.flatnonzero(grid.face_select), [0, 3])
+    assert len(grid.projection_handlers) == 1
+
+
+def test_subset_filter(tmp_path):
+    grid = UGXGrid.read(write(tmp_path, "grid.ugx", GRID), subsets={"right"})
+
+    # vertices 0 and 2 are dropped, the quads are renumbered
+    np.testing.assert_array_equal(grid.vertices[:, 0], [1, 1, 2, 2, 3, 3])
+    assert len(grid.triangles) == 0
+    np.testing.assert_array_equal(grid.quads, [[0, 2, 3, 1], [2, 4, 5, 3]])
+    np.testing.assert_array_equal(grid.face_subset, [1, 1])
+
+    # edge 3 belongs to the left subset, but bounds the first quad
+    np.testing.assert_array_equal(attachment(grid, "weight"), [3, 5, 6, 7, 8, 9, 10])
+    np.testing.assert_array_equal(grid.edges, [[0, 1], [0, 2], [2, 3], [3, 1], [2, 4], [4, 5], [5, 3]])
+
+
+def test_box_filter(tmp_path):
+    grid = UGXGrid.read(write(tmp_path, "grid.ugx", GRID), bbox=((1.5, -1, -1), (4, 2, 1)))
+
+    np.testing.assert_array_equal(grid.vertices[:, 0], [2, 2, 3, 3])
+    assert len(grid.triangles) == 0
+    np.testing.assert_array_equal(grid.quads, [[0, 2, 3, 1]])
+    np.testing.assert_array_equal(grid.edges, [[0, 1], [0, 2], [2, 3], [3, 1]])
+
+    # the kept quad is face 3 of the file, after both triangles
+    np.testing.assert_array_equal(attachment(grid, "id"), [3])
+    np.testing.assert_array_equal(grid.face_subset, [1])
+    np.testing.assert_array_equal(grid.handlers[0]["face_subset"], [0])
+
+
+def test_filter_remaps_selector_and_attachments(tmp_path):
+    grid = UGXGrid.read(write(tmp_path, "grid.ugx", GRID), subsets={"right"}, bbox=((1.5, -1, -1), (4, 2, 1)))
+
+    np.testing.assert_array_equal(attachment(grid, "temp"), [40, 50, 60, 70])
+    np.testing.assert_array_equal(attachment(grid, "weight"), [6, 8, 9, 10])
+    np.testing.assert_array_equal(attachment(grid, "id"), [3])
+
+    np.testing.assert_array_equal(grid.vertex_select, [False, False, True, False])
+    np.testing.assert_array_equal(grid.edge_select, [False, True, False, False])
+    np.testing.assert_array_equal(grid.face_select, [True])
+
+    np.testing.assert_array_equal(grid.handlers[0]["edge_subset"], [-1, 0, -1, -1])
+
+
+def test_merge(tmp_path):
+    grid = UGXGrid.read(write(tmp_path, "grid.ugx", GRID))
+    part = UGXGrid.read(write(tmp_path, "part.ugx", PART))
+
+    merged = UGXGrid.merge([grid, part])
+
+    assert merged.vertices.shape == (11, 3)
+    for elements in (merged.edges, merged.triangles, merged.quads):
+        assert elements.dtype == np.int32
+
+    # vertices of the second part follow the 8 vertices of the first
+    np.testing.assert_array_equal(merged.edges[11:], [[8, 9], [9, 10], [10, 8]])
+    np.testing.assert_array_equal(merged.triangles, [[0, 1, 2], [1, 3, 2], [8, 9, 10]])
+    np.testing.assert_array_equal(merged.quads, [[1, 4, 5, 3], [4, 6, 7, 5]])
+
+    # faces are ordered by type, subsets and handlers are merged by name
+    assert [s["name"] for s in merged.subsets] == ["left", "right", "inner"]
+    np.testing.assert_array_equal(merged.face_subset, [0, 0, 2, 1, 1])
+    np.testing.assert_array_equal(attachment(merged, "id"), [0, 1, 5, 2, 3])
+    np.testing.assert_array_equal(merged.handlers[0]["face_subset"], [-1, 0, -1, -1, 0])
+
+    # the second part has no vertex attachment
+    np.testing.assert_array_equal(attachment(merged, "temp")[8:], [0, 0, 0])
+
+
+@pytest.mark.parametrize("section, replacement", [
+    ("<edges>0 1 1 2", "<edges>1 8 1 2"),
+    ("<triangles>0 1 2", "<triangles>0 1 9"),
+    ("<faces>2 3</faces>", "<faces>2 4</faces>"),
+    ("<edges>3 8</edges>", "<edges>3 11</edges>"),
+])
+def test_out_of_range_index(tmp_path, section, replacement):
+    path = write(tmp_path, "broken.ugx", GRID.replace(section, replacement))
+
+    with pytest.raises(ValueError, match="not one of the"):
+        UGXGrid.read(path)